@@ -1,32 +1,12 @@
 #!/bin/bash
 # Set up the TCRMP orthomosaic pipeline.
 # Creates a Python venv and installs dependencies.
-# Also checks for required system tools.
 
 set -e
 
 echo "=== TCRMP Ortho Pipeline Setup ==="
 echo ""
 
-# Check system dependencies
-echo "Checking system dependencies..."
-
-if ! command -v cwebp &> /dev/null; then
-    echo "  cwebp not found. Install with: brew install webp"
-    exit 1
-else
-    echo "  cwebp: $(which cwebp)"
-fi
-
-if ! command -v sips &> /dev/null; then
-    echo "  sips not found (should be built into macOS)."
-    exit 1
-else
-    echo "  sips: $(which sips)"
-fi
-
-echo ""
-
 # Create venv
 if [ ! -d ".venv" ]; then
     echo "Creating virtual environment..."
@@ -40,6 +20,16 @@ source .venv/bin/activate
 pip install --quiet --upgrade pip
 pip install --quiet -r requirements.txt
 
+if ! python3 -c "from PIL import features; assert features.check('webp')" &> /dev/null; then
+    echo "  Pillow was built without WebP support; reinstall it from the official wheels."
+    exit 1
+fi
+
+if ! python3 -c "import pyvips" &> /dev/null; then
+    echo "  Note: pyvips not installed — export edited TIFs from Lightroom as 8 bits/component."
+    echo "  (Pillow can't read every 16-bit TIF; see README.md to install pyvips.)"
+fi
+
 echo ""
 echo "Setup complete!"
 echo ""
@@ -21,15 +21,34 @@ Examples:
     python3 copy_orthomosaics.py /Volumes/nas/2024_pbl/orthomosaics 2024_pbl
     python3 copy_orthomosaics.py /Volumes/nas/more_sites 2025_annual          # adds to existing project
     python3 copy_orthomosaics.py /Volumes/nas/retakes 2025_annual --force     # allows overwriting
+    python3 copy_orthomosaics.py /Volumes/nas/more_sites 2025_annual -j 8     # 8 copies in flight
 """
 
 import argparse
+import ctypes
+import errno
 import os
 import re
 import shutil
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 PROJECT_FILE = ".current_project"
 
+# Metashape subdir names, e.g. TCRMP20251010_3D_BWR_T1_Proxy
+SUBDIR_SITE_RE = re.compile(r'_3D_([A-Z]{3})_')
+SUBDIR_TRANSECT_RE = re.compile(r'_3D_[A-Z]{3}_(T\d+(?:_\d+)?)')
+
+# copyfile(3) flags from <copyfile.h> (macOS)
+COPYFILE_STAT = 1 << 1
+COPYFILE_XATTR = 1 << 2
+COPYFILE_DATA = 1 << 3
+COPYFILE_CLONE = 1 << 24
+
+# Errors meaning "this copy method isn't available here" — try the next one
+COPY_UNSUPPORTED = {errno.EINVAL, errno.ENOSYS, errno.EOPNOTSUPP,
+                    errno.EPERM, errno.EXDEV}
+
 
 def discover_source_files(source_dir):
     """Walk source subdirectories and find *_full.tif files.
@@ -38,31 +57,86 @@ def discover_source_files(source_dir):
         source_dir/
           TCRMP20251010_3D_BWR_T1_Proxy/
             TCRMP20251010_3D_BWR_T1_Proxy_full.tif
-    """
-    results = []
-    for subdir in sorted(os.listdir(source_dir)):
-        subdir_path = os.path.join(source_dir, subdir)
-        if not os.path.isdir(subdir_path):
-            continue
 
-        tif_path = os.path.join(subdir_path, subdir + "_full.tif")
-        if not os.path.exists(tif_path):
-            continue
+    Returns (dest_name, tif_path, stat_result) tuples; the one stat that
+    proves the TIF exists also supplies its size and mtime.
+    """
+    with os.scandir(source_dir) as it:
+        subdirs = sorted((e for e in it if e.is_dir()), key=lambda e: e.name)
 
-        match = re.search(r'_3D_([A-Z]{3})_', subdir)
+    results = []
+    for entry in subdirs:
+        subdir = entry.name
+        match = SUBDIR_SITE_RE.search(subdir)
         if not match:
             continue
         site_code = match.group(1)
 
-        t_match = re.search(r'_3D_[A-Z]{3}_(T\d+(?:_\d+)?)', subdir)
+        tif_path = os.path.join(entry.path, subdir + "_full.tif")
+        try:
+            src_st = os.stat(tif_path)
+        except FileNotFoundError:
+            continue
+
+        t_match = SUBDIR_TRANSECT_RE.search(subdir)
         transect = t_match.group(1) if t_match else "T0"
 
         dest_name = f"{site_code}_{transect}_full.tif"
-        results.append((dest_name, tif_path))
+        results.append((dest_name, tif_path, src_st))
 
     return results
 
 
+def fast_copy(src_path, dest_path, size):
+    """Copy a file's data and metadata without bouncing it through userspace.
+
+    On Linux, copy_file_range keeps the copy in the kernel and lets NFS and
+    CoW filesystems (btrfs/XFS) do a server-side copy or reflink.  If the
+    filesystem rejects it, or it stops short of `size` (the source's
+    st_size; some FUSE and pseudo filesystems report EOF straight away),
+    a read/write loop resumes where it stopped.  On macOS, copyfile(3)
+    with COPYFILE_CLONE clones on APFS and otherwise copies kernel-side.
+    Anything else falls back to shutil.copy2.
+    """
+    if sys.platform == "linux" and hasattr(os, "copy_file_range"):
+        with open(src_path, "rb") as fsrc, open(dest_path, "wb") as fdst:
+            in_fd, out_fd = fsrc.fileno(), fdst.fileno()
+            # Only SEQUENTIAL: WILLNEED would pull the whole file into
+            # the page cache even when the copy is server-side/reflinked.
+            os.posix_fadvise(in_fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            offset = 0
+            try:
+                while n := os.copy_file_range(in_fd, out_fd, 1 << 30, offset, offset):
+                    offset += n
+            except OSError as e:
+                if e.errno not in COPY_UNSUPPORTED:
+                    raise
+            if offset < size:
+                # Explicit offsets left both file positions at 0
+                fsrc.seek(offset)
+                fdst.seek(offset)
+                shutil.copyfileobj(fsrc, fdst)
+        shutil.copystat(src_path, dest_path)
+        return
+
+    elif sys.platform == "darwin":
+        libc = ctypes.CDLL("/usr/lib/libSystem.B.dylib", use_errno=True)
+        flags = COPYFILE_CLONE | COPYFILE_DATA | COPYFILE_STAT | COPYFILE_XATTR
+        if libc.copyfile(os.fsencode(src_path), os.fsencode(dest_path),
+                         None, ctypes.c_uint32(flags)) == 0:
+            return
+
+    shutil.copy2(src_path, dest_path)
+
+
+def positive_int(value):
+    """argparse type for counts that must be at least 1."""
+    n = int(value)
+    if n < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return n
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Copy orthomosaic TIFs from a source directory into data/{PROJECT_DIR}/originals/."
@@ -85,6 +159,12 @@ def main():
         action="store_true",
         help="Overwrite existing files (default: skip files that already exist)"
     )
+    parser.add_argument(
+        "--parallel", "-j",
+        type=positive_int,
+        default=4,
+        help="Number of files to copy concurrently (default: 4; use 1 for spinning disks)"
+    )
     args = parser.parse_args()
 
     source_dir = args.source_dir
@@ -106,29 +186,73 @@ def main():
         print(f"No *_full.tif files found in {source_dir}")
         return 1
 
-    copied = 0
     skipped = 0
+    jobs = []
 
-    for dest_name, src_path in files:
+    for dest_name, src_path, src_st in files:
         dest_path = os.path.join(dest_dir, dest_name)
 
-        if os.path.exists(dest_path):
+        try:
+            dest_st = os.stat(dest_path)
+        except FileNotFoundError:
+            dest_st = None
+
+        if dest_st is not None:
             if not args.force:
                 skipped += 1
                 continue
             # --force: overwrite only if source is newer
-            if os.path.getmtime(dest_path) >= os.path.getmtime(src_path):
+            if dest_st.st_mtime >= src_st.st_mtime:
                 skipped += 1
                 continue
 
-        src_size = os.path.getsize(src_path) / (1024 * 1024)
-        print(f"  Copying {dest_name} ({src_size:.0f} MB)...")
-        shutil.copy2(src_path, dest_path)
-        copied += 1
+        old_mtime = dest_st.st_mtime_ns if dest_st else None
+        jobs.append((dest_name, src_st.st_size, src_path, dest_path, old_mtime))
+
+    # Several streams in flight keep a NAS link busy; each copy is I/O-bound
+    # and runs in the kernel, so threads are enough.
+    if jobs:
+        print(f"  Copying {len(jobs)} files ({args.parallel} at a time)...")
+    # A failed copy is reported and the rest carry on, as in import_edited.py
+    failed = 0
+    interrupted = False
+    with ThreadPoolExecutor(max_workers=args.parallel) as ex:
+        futures = {
+            ex.submit(fast_copy, src_path, dest_path, size):
+                (dest_name, size, dest_path, old_mtime)
+            for dest_name, size, src_path, dest_path, old_mtime in jobs
+        }
+        try:
+            for fut in as_completed(futures):
+                dest_name, size, dest_path, old_mtime = futures[fut]
+                try:
+                    fut.result()
+                except OSError as e:
+                    print(f"  FAILED {dest_name}: {e}")
+                    failed += 1
+                    # A partial file would be skipped as "already present"
+                    # next run; one the copy never touched is kept
+                    try:
+                        if os.stat(dest_path).st_mtime_ns != old_mtime:
+                            os.remove(dest_path)
+                    except FileNotFoundError:
+                        pass
+                    continue
+                print(f"  Copied {dest_name} ({size / (1024 * 1024):.0f} MB)")
+        except KeyboardInterrupt:
+            # Leaving the with block waits for the queue, which would start
+            # every remaining copy; drop those and finish the ones running
+            ex.shutdown(wait=False, cancel_futures=True)
+            print("\nInterrupted — finishing the copies in progress, then stopping.")
+            interrupted = True
+    if interrupted:
+        return 130
+    copied = len(jobs) - failed
 
-    print(f"\nDone! {copied} copied, {skipped} already present.")
+    print(f"\nDone! {copied} copied, {skipped} already present."
+          + (f" {failed} FAILED — re-run to retry them." if failed else ""))
     print(f"Project: {project_dir}  →  {dest_dir}")
-    return 0
+    return 1 if failed else 0
 
 
 if __name__ == "__main__":
@@ -11,51 +11,150 @@ Usage:
 """
 
 import argparse
+import hashlib
+import io
 import os
 import re
-import subprocess
-import tempfile
+import sys
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pptx import Presentation
 from pptx.util import Inches, Pt
 from pptx.enum.text import PP_ALIGN
 from PIL import Image
 
+try:
+    import pyvips
+except ImportError:
+    pyvips = None
+else:
+    pyvips.cache_set_max(0)
+
+# Optional pyvips and DECODE_ERRORS work as in generate_ortho_gallery.py
+DECODE_ERRORS = (OSError,) + ((pyvips.Error,) if pyvips else ())
+
+Image.MAX_IMAGE_PIXELS = None  # see generate_ortho_gallery.py
+
 PROJECT_FILE = ".current_project"
+CACHE_DIR = os.path.join(".cache", "jpeg")
+
+FULL_TIF_RE = re.compile(r'^([A-Z]{3})_(T\d+(?:_\d+)?)_full\.tif$')
+DIGITS_RE = re.compile(r'\d+')
+
+# Picture slot geometry (3 per slide) and the resolution they are rendered
+# at.  JPEGs are downsampled to fit the largest slot at JPEG_DPI, since any
+# extra source pixels would only bloat the PPTX.
+SLOT_MAX_WIDTH = Inches(12.5)
+SLOT_HEIGHT = Inches(6.5) / 3 - Inches(0.3)
+JPEG_DPI = 150
+JPEG_MAX_SIZE = (
+    int(SLOT_MAX_WIDTH * JPEG_DPI / Inches(1)),
+    int(SLOT_HEIGHT * JPEG_DPI / Inches(1)),
+)
+
+# Conversions run at once.  Pillow decodes each TIF whole (about 400 MB for
+# a 16000x6000 ortho), so this stays small whatever the core count.
+CONVERT_WORKERS = 4
 
 
 def natural_sort_key(t):
-    return [int(p) for p in re.findall(r'\d+', t)]
+    return [int(p) for p in DIGITS_RE.findall(t)]
 
 
 def discover_files(src_dir):
     """Read {SITE}_{TRANSECT}_full.tif files from a directory."""
     site_files = defaultdict(list)
-    for fname in sorted(os.listdir(src_dir)):
-        if not fname.endswith("_full.tif"):
+    with os.scandir(src_dir) as it:
+        entries = sorted(it, key=lambda e: e.name)
+    for entry in entries:
+        if not entry.name.endswith("_full.tif") or not entry.is_file():
             continue
-        match = re.match(r'^([A-Z]{3})_(T\d+(?:_\d+)?)_full\.tif$', fname)
+        match = FULL_TIF_RE.match(entry.name)
         if not match:
             continue
         site_code = match.group(1)
         transect = match.group(2)
-        tif_path = os.path.join(src_dir, fname)
-        site_files[site_code].append((transect, tif_path))
+        site_files[site_code].append((transect, entry.path))
 
     for site in site_files:
         site_files[site].sort(key=lambda x: natural_sort_key(x[0]))
     return site_files
 
 
-def tif_to_jpeg(tif_path, tmp_dir):
-    basename = os.path.splitext(os.path.basename(tif_path))[0]
-    jpg_path = os.path.join(tmp_dir, basename + ".jpg")
-    subprocess.run(
-        ["sips", "-s", "format", "jpeg", "-s", "formatOptions", "80",
-         tif_path, "--out", jpg_path],
-        capture_output=True, check=True
-    )
-    return jpg_path
+# F_RDAHEAD from <sys/fcntl.h> (macOS)
+F_RDAHEAD = 45
+
+
+def prefetch(f):
+    """Sequential-read hint for open file f, as in generate_ortho_gallery.py."""
+    fd = f.fileno()
+    try:
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        elif sys.platform == "darwin":
+            import fcntl
+            fcntl.fcntl(fd, F_RDAHEAD, 1)
+    except OSError:
+        pass
+
+
+def tif_to_jpeg(tif_path):
+    """Convert one TIF to a quality-80 JPEG in memory; returns a BytesIO.
+
+    The image is shrunk to JPEG_MAX_SIZE first (thumbnail() uses draft mode
+    where the decoder supports it), so encode work scales with the slide,
+    not the ortho.  python-pptx embeds the buffer directly, so no temp
+    file is written and read back.  Uses pyvips if available, which also
+    reads the 16-bit TIFs Pillow can't; else Pillow.
+    """
+    buf = io.BytesIO()
+    with open(tif_path, "rb") as f:
+        prefetch(f)
+
+        if pyvips is not None:
+            im = pyvips.Image.thumbnail(tif_path, JPEG_MAX_SIZE[0],
+                                        height=JPEG_MAX_SIZE[1], size="down")
+            if im.format != "uchar":
+                im = im.colourspace("srgb")
+            if im.hasalpha():
+                im = im.flatten()
+            buf.write(im.jpegsave_buffer(Q=80, optimize_coding=True))
+            buf.seek(0)
+            return buf
+
+        with Image.open(f) as im:
+            im.thumbnail(JPEG_MAX_SIZE, Image.Resampling.LANCZOS)
+            im.convert("RGB").save(buf, "JPEG", quality=80, optimize=True)
+    buf.seek(0)
+    return buf
+
+
+def cache_path_for(tif_path, tag, ext):
+    """Cache file for tif_path, keyed on its path, mtime, size and `tag`."""
+    st = os.stat(tif_path)
+    key = f"{tif_path}|{st.st_mtime_ns}|{st.st_size}|{tag}"
+    digest = hashlib.blake2b(key.encode()).hexdigest()[:16]
+    return os.path.join(CACHE_DIR, digest + ext)
+
+
+def cached_jpeg(tif_path):
+    """Return the JPEG for tif_path as a BytesIO, from CACHE_DIR when possible.
+
+    Unchanged TIFs are never re-encoded, so re-running after a layout tweak
+    only rebuilds the slides.
+    """
+    jpg_path = cache_path_for(tif_path, f"q80-{JPEG_MAX_SIZE[0]}x{JPEG_MAX_SIZE[1]}", ".jpg")
+    if os.path.exists(jpg_path):
+        with open(jpg_path, "rb") as f:
+            return io.BytesIO(f.read())
+
+    buf = tif_to_jpeg(tif_path)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = f"{jpg_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(buf.getvalue())
+    os.replace(tmp_path, jpg_path)
+    return buf
 
 
 def main():
@@ -99,67 +198,88 @@ def main():
     prs.slide_width = Inches(13.333)
     prs.slide_height = Inches(7.5)
 
-    with tempfile.TemporaryDirectory() as tmp_dir:
-        for site in sorted_sites:
-            files = site_files[site]
-
-            for page_idx in range(0, len(files), 3):
-                chunk = files[page_idx:page_idx + 3]
-                n = len(chunk)
+    # Convert every TIF up front (Pillow releases the GIL while coding, so
+    # the CONVERT_WORKERS threads run in parallel); slide assembly only
+    # touches the in-memory JPEGs.
+    tif_paths = [tif_path for site in sorted_sites for _, tif_path in site_files[site]]
+    print(f"Converting {len(tif_paths)} images...")
+    with ThreadPoolExecutor(max_workers=CONVERT_WORKERS) as ex:
+        futures = [ex.submit(cached_jpeg, tif_path) for tif_path in tif_paths]
+
+    # Leave out TIFs that couldn't be decoded rather than failing the whole deck
+    jpegs = {}
+    for tif_path, fut in zip(tif_paths, futures):
+        try:
+            jpegs[tif_path] = fut.result()
+        except DECODE_ERRORS as e:
+            print(f"  Skipping {os.path.basename(tif_path)}: {e}")
+            print("    (re-export it from Lightroom; as 8-bit if it is 16-bit)")
+            jpegs[tif_path] = None
+    for site in sorted_sites:
+        site_files[site] = [(t, p) for t, p in site_files[site] if jpegs[p] is not None]
+    sorted_sites = [site for site in sorted_sites if site_files[site]]
+    print()
 
-                slide = prs.slides.add_slide(prs.slide_layouts[6])
+    for site in sorted_sites:
+        files = site_files[site]
 
-                txBox = slide.shapes.add_textbox(
-                    Inches(0.5), Inches(0.1), Inches(12), Inches(0.5)
+        for page_idx in range(0, len(files), 3):
+            chunk = files[page_idx:page_idx + 3]
+            n = len(chunk)
+
+            slide = prs.slides.add_slide(prs.slide_layouts[6])
+
+            txBox = slide.shapes.add_textbox(
+                Inches(0.5), Inches(0.1), Inches(12), Inches(0.5)
+            )
+            p = txBox.text_frame.paragraphs[0]
+            suffix = " (continued)" if page_idx > 0 else ""
+            p.text = f"{site}{suffix}"
+            p.font.size = Pt(28)
+            p.font.bold = True
+            p.alignment = PP_ALIGN.CENTER
+
+            top_margin = Inches(0.7)
+            img_height = SLOT_HEIGHT
+
+            for i, (transect, tif_path) in enumerate(chunk):
+                print(f"  Processing {site} {transect}...")
+                jpeg = jpegs[tif_path]
+
+                with Image.open(jpeg) as img:
+                    img_w, img_h = img.size
+                jpeg.seek(0)
+
+                aspect = img_w / img_h
+                slot_top = top_margin + i * (img_height + Inches(0.3))
+
+                max_width = SLOT_MAX_WIDTH
+                calc_width = img_height * aspect
+                if calc_width > max_width:
+                    final_width = max_width
+                    final_height = max_width / aspect
+                else:
+                    final_width = calc_width
+                    final_height = img_height
+
+                left = (prs.slide_width - final_width) / 2
+
+                label_box = slide.shapes.add_textbox(
+                    Inches(0.5), slot_top, Inches(12), Inches(0.25)
+                )
+                label_p = label_box.text_frame.paragraphs[0]
+                label_p.text = transect
+                label_p.font.size = Pt(14)
+                label_p.font.bold = True
+                label_p.alignment = PP_ALIGN.CENTER
+
+                img_top = slot_top + Inches(0.25)
+                slide.shapes.add_picture(
+                    jpeg, int(left), int(img_top),
+                    int(final_width), int(final_height)
                 )
-                p = txBox.text_frame.paragraphs[0]
-                suffix = " (continued)" if page_idx > 0 else ""
-                p.text = f"{site}{suffix}"
-                p.font.size = Pt(28)
-                p.font.bold = True
-                p.alignment = PP_ALIGN.CENTER
-
-                top_margin = Inches(0.7)
-                available_height = Inches(6.5)
-                img_height = available_height / 3 - Inches(0.3)
-
-                for i, (transect, tif_path) in enumerate(chunk):
-                    print(f"  Processing {site} {transect}...")
-                    jpg_path = tif_to_jpeg(tif_path, tmp_dir)
-
-                    with Image.open(jpg_path) as img:
-                        img_w, img_h = img.size
-
-                    aspect = img_w / img_h
-                    slot_top = top_margin + i * (img_height + Inches(0.3))
-
-                    max_width = Inches(12.5)
-                    calc_width = img_height * aspect
-                    if calc_width > max_width:
-                        final_width = max_width
-                        final_height = max_width / aspect
-                    else:
-                        final_width = calc_width
-                        final_height = img_height
-
-                    left = (prs.slide_width - final_width) / 2
-
-                    label_box = slide.shapes.add_textbox(
-                        Inches(0.5), slot_top, Inches(12), Inches(0.25)
-                    )
-                    label_p = label_box.text_frame.paragraphs[0]
-                    label_p.text = transect
-                    label_p.font.size = Pt(14)
-                    label_p.font.bold = True
-                    label_p.alignment = PP_ALIGN.CENTER
-
-                    img_top = slot_top + Inches(0.25)
-                    slide.shapes.add_picture(
-                        jpg_path, int(left), int(img_top),
-                        int(final_width), int(final_height)
-                    )
-
-                print(f"  Slide for {site} (images {page_idx+1}-{page_idx+n})")
+
+            print(f"  Slide for {site} (images {page_idx+1}-{page_idx+n})")
 
     prs.save(output_pptx)
     print(f"\nSaved: {output_pptx}")
@@ -3,12 +3,16 @@
 Step 4a: Generate an HTML gallery of TCRMP orthomosaic images.
 
 Reads datasets from datasets.json, finds edited TIFs in data/<project_dir>/edited/,
-converts to lossless WebP, and builds a self-contained HTML gallery.
+converts to WebP, and builds a static HTML gallery (index.html plus
+styles.css and viewer.js).
 
 Each dataset entry in datasets.json maps to a project directory:
     {"id": "2025_annual", "label": "2025 Annual"}
     → reads TIFs from data/2025_annual/edited/
     → writes WebPs as docs/images/2025_annual_{SITE}_{TRANSECT}.webp
+      (full resolution, for the lightbox), plus _2560.webp and _1280.webp
+      variants the wall picks between via srcset and a small _thumb.webp
+      for the hero mosaic
 
 Layout:
   - Full-bleed hero mosaic wall with floating title
@@ -17,6 +21,9 @@ Layout:
   - Click-to-magnify lightbox with zoom/pan
   - Designed to grow: just add entries to datasets.json
 
+The page markup lives in templates/gallery.html.j2 next to this script;
+the stylesheet and viewer script beside it are copied to the output dir.
+
 Usage:
     python3 generate_ortho_gallery.py
     python3 generate_ortho_gallery.py --output-dir /path/to/output
@@ -24,12 +31,69 @@ Usage:
 """
 
 import argparse
+import filecmp
+import hashlib
 import json
 import os
 import re
-import subprocess
 import shutil
+import sys
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
+from jinja2 import Environment, FileSystemLoader
+from PIL import Image
+
+try:
+    import pyvips
+except ImportError:
+    pyvips = None
+else:
+    # Each image is touched once; libvips' operation cache only holds memory.
+    pyvips.cache_set_max(0)
+
+# What converting a TIF the decoder can't read raises: Pillow gives OSError
+# (UnidentifiedImageError for a 16-bit export it doesn't support, plain
+# OSError for one truncated by an interrupted export or copy); pyvips its
+# own Error, though it renders a truncated TIF with the missing rows blank
+# rather than failing.  Such a TIF is skipped with a warning instead of
+# ending the run.
+DECODE_ERRORS = (OSError,) + ((pyvips.Error,) if pyvips else ())
+
+# Orthomosaics routinely exceed Pillow's decompression-bomb guard.
+Image.MAX_IMAGE_PIXELS = None
+
+# Long-edge caps of the WebPs written per image, largest first.  The first
+# is the main image the lightbox opens for zoom/pan, so it keeps full
+# resolution up to WebP's 16383 px limit.  The rest are for the wall, where
+# nothing renders wider than a viewport: the largest is the <img> src and
+# all are offered to smaller screens through srcset.
+WEBP_MAX_EDGE = 16383
+WALL_SIZES = (2560, 1280)
+WEBP_SIZES = (WEBP_MAX_EDGE,) + WALL_SIZES
+
+# Conversions run at once.  Each holds a whole main WebP while encoding
+# (libwebp needs the full picture; Pillow also decodes the whole TIF), about
+# 1.5-2 GB for a 16000x6000 ortho, so this stays small whatever the core
+# count.  libvips threads each conversion internally anyway.
+CONVERT_WORKERS = 2
+
+# Hero-strip thumbnail: the strip is 180 px tall, so bound the height (with
+# some HiDPI headroom) rather than the long edge; wide orthos stay sharp.
+THUMB_BOX = (1280, 240)
+THUMB_QUALITY = 70
+
+# Converted WebPs live here between runs, outside the output dir, so
+# unchanged TIFs are never re-encoded.
+CACHE_DIR = os.path.join(".cache", "webp")
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+
+# Static files served next to index.html, so browsers can cache them.
+STATIC_ASSETS = ("styles.css", "viewer.js")
+
+FULL_TIF_RE = re.compile(r'^([A-Z]{3})_(T\d+(?:_\d+)?)_full\.tif$')
+DIGITS_RE = re.compile(r'\d+')
 
 
 def discover_files(src_dir):
@@ -37,57 +101,262 @@ def discover_files(src_dir):
     site_files = defaultdict(list)
     if not os.path.isdir(src_dir):
         return site_files
-    for fname in sorted(os.listdir(src_dir)):
-        if not fname.endswith("_full.tif"):
+    with os.scandir(src_dir) as it:
+        entries = sorted(it, key=lambda e: e.name)
+    for entry in entries:
+        if not entry.name.endswith("_full.tif") or not entry.is_file():
             continue
-        match = re.match(r'^([A-Z]{3})_(T\d+(?:_\d+)?)_full\.tif$', fname)
+        match = FULL_TIF_RE.match(entry.name)
         if not match:
             continue
         site_code = match.group(1)
         transect = match.group(2)
-        tif_path = os.path.join(src_dir, fname)
-        site_files[site_code].append((transect, tif_path))
+        site_files[site_code].append((transect, entry.path))
     return site_files
 
 
-def convert_tif_to_webp(tif_path, webp_path, quality=85):
-    """Convert TIF to lossy WebP via sips (TIF→PNG) then cwebp (PNG→WebP).
+# F_RDAHEAD from <sys/fcntl.h> (macOS): turn read-ahead on for a file
+F_RDAHEAD = 45
+
+
+def prefetch(f):
+    """Hint that the open file f will be read start to end.
 
-    Quality 85 is visually indistinguishable from lossless on screen and
-    typically 90%+ smaller.
+    Lets the kernel read ahead aggressively instead of page by page.  Only
+    a sequential hint, no WILLNEED: several multi-GB TIFs are in flight at
+    once, and prefetching them whole would just churn the page cache
+    (copy_orthomosaics.py follows the same policy).  Advisory only, so
+    errors (e.g. from network filesystems) are ignored.
     """
-    import tempfile
-    with tempfile.NamedTemporaryFile(suffix=".png", delete=True) as tmp:
-        tmp_png = tmp.name
+    fd = f.fileno()
     try:
-        subprocess.run(
-            ["sips", "-s", "format", "png", tif_path, "--out", tmp_png],
-            capture_output=True, check=True
-        )
-        subprocess.run(
-            ["cwebp", "-q", str(quality), "-quiet", tmp_png, "-o", webp_path],
-            capture_output=True, check=True
-        )
-    finally:
-        if os.path.exists(tmp_png):
-            os.remove(tmp_png)
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        elif sys.platform == "darwin":
+            import fcntl
+            fcntl.fcntl(fd, F_RDAHEAD, 1)
+    except OSError:
+        pass
+
+
+def webp_variant(webp_name, edge):
+    """Filename of the `edge`-px variant of webp_name (see WEBP_SIZES)."""
+    if edge == WEBP_SIZES[0]:
+        return webp_name
+    stem, ext = os.path.splitext(webp_name)
+    return f"{stem}_{edge}{ext}"
+
+
+def thumb_name(webp_name):
+    """Filename of the hero-strip thumbnail for webp_name."""
+    stem, ext = os.path.splitext(webp_name)
+    return f"{stem}_thumb{ext}"
+
+
+def output_names(webp_name):
+    """Every file written for webp_name: the WEBP_SIZES variants, then the thumb."""
+    return [webp_variant(webp_name, edge) for edge in WEBP_SIZES] + [thumb_name(webp_name)]
+
+
+def vips_thumbnail(tif_path, edge):
+    """Stream tif_path through pyvips, shrunk to fit edge px, as 8-bit sRGB."""
+    im = pyvips.Image.thumbnail(tif_path, edge, height=edge, size="down")
+    if im.format != "uchar":
+        im = im.colourspace("srgb")
+    return im
+
+
+def convert_tif_to_webp(tif_path, webp_paths, thumb_path, quality=85):
+    """Convert TIF to lossy WebPs in-process with pyvips if available, else Pillow.
+
+    Writes one WebP per WEBP_SIZES entry to the matching webp_paths entry,
+    then a THUMB_BOX thumbnail to thumb_path, shrinking each output from
+    the previous one (pyvips re-reads the TIF for the outputs after the
+    main one; see below).  A size the image already fits is hardlinked to
+    the previous output rather than encoded again.  Quality 85 is visually
+    indistinguishable from lossless on screen and typically 90%+ smaller.
+    Returns the (width, height) of the largest.  pyvips also reads the
+    16-bit TIFs Pillow can't; see DECODE_ERRORS for what either raises.
+    """
+    with open(tif_path, "rb") as f:
+        prefetch(f)
+
+        if pyvips is not None:
+            # thumbnail() streams the TIF through a sequential, demand-driven
+            # pipeline, so the full-resolution main WebP is encoded straight
+            # from the decoder without a decoded copy being kept around.
+            im = vips_thumbnail(tif_path, WEBP_SIZES[0])
+            size = im.width, im.height
+            im.webpsave(webp_paths[0], Q=quality, effort=4)
+            # A sequential read can't be replayed, so the smaller outputs
+            # come from a second pass; only its result, at most
+            # WEBP_SIZES[1] px, is held in memory.
+            im = vips_thumbnail(tif_path, WEBP_SIZES[1]).copy_memory()
+            prev_path, prev_edge = webp_paths[0], max(size)
+            for edge, webp_path in zip(WEBP_SIZES[1:], webp_paths[1:]):
+                if prev_edge <= edge:
+                    # Nothing to shrink: reuse the previous output's file
+                    link_or_copy(prev_path, webp_path)
+                    continue
+                im = im.thumbnail_image(edge, height=edge, size="down")
+                im.webpsave(webp_path, Q=quality, effort=4)
+                prev_path, prev_edge = webp_path, max(im.width, im.height)
+            im = im.thumbnail_image(THUMB_BOX[0], height=THUMB_BOX[1], size="down")
+            im.webpsave(thumb_path, Q=THUMB_QUALITY, effort=4)
+            return size
+
+        with Image.open(f) as im:
+            im.thumbnail((WEBP_SIZES[0], WEBP_SIZES[0]), Image.Resampling.LANCZOS)
+            if im.mode not in ("RGB", "RGBA"):
+                im = im.convert("RGB")
+            size = im.size
+            prev_path = None
+            for edge, webp_path in zip(WEBP_SIZES, webp_paths):
+                if prev_path is not None and max(im.size) <= edge:
+                    # Nothing to shrink: reuse the previous output's file
+                    link_or_copy(prev_path, webp_path)
+                    continue
+                im.thumbnail((edge, edge), Image.Resampling.LANCZOS)
+                im.save(webp_path, "WEBP", quality=quality, method=4)
+                prev_path = webp_path
+            im.thumbnail(THUMB_BOX, Image.Resampling.LANCZOS)
+            im.save(thumb_path, "WEBP", quality=THUMB_QUALITY, method=4)
+            return size
 
 
 def natural_sort_key(t):
-    return [int(p) for p in re.findall(r'\d+', t)]
+    return [int(p) for p in DIGITS_RE.findall(t)]
 
 
 def get_image_dims(img_path):
-    """Get width/height via sips (macOS)."""
-    r = subprocess.run(
-        ["sips", "-g", "pixelWidth", "-g", "pixelHeight", img_path],
-        capture_output=True, text=True
-    )
-    w = int(re.search(r'pixelWidth:\s*(\d+)', r.stdout).group(1))
-    h = int(re.search(r'pixelHeight:\s*(\d+)', r.stdout).group(1))
+    """Get width/height from the image header (no pixel decode)."""
+    with Image.open(img_path) as im:
+        return im.size
+
+
+def cache_paths_for(tif_path, tags, ext):
+    """Cache files for tif_path, keyed on its path, mtime, size and each tag."""
+    st = os.stat(tif_path)
+    paths = []
+    for tag in tags:
+        key = f"{tif_path}|{st.st_mtime_ns}|{st.st_size}|{tag}"
+        digest = hashlib.blake2b(key.encode()).hexdigest()[:16]
+        paths.append(os.path.join(CACHE_DIR, digest + ext))
+    return paths
+
+
+def link_or_copy(src_path, dest_path):
+    """Hardlink src_path to dest_path, copying if links aren't possible.
+
+    Does nothing if dest_path is already a link to src_path, i.e. the
+    output is up to date with the TIF and the conversion settings.
+    """
+    try:
+        if os.path.samefile(src_path, dest_path):
+            return
+        os.remove(dest_path)
+    except FileNotFoundError:
+        pass
+    try:
+        os.link(src_path, dest_path)
+    except OSError:
+        shutil.copyfile(src_path, dest_path)
+
+
+def convert_job(job):
+    """Convert one (tif_path, webp_path) pair; returns the main WebP's (w, h).
+
+    Writes every output_names() file next to webp_path.  They come from
+    CACHE_DIR when the TIF is unchanged, in which case only the cached
+    file's header is read.  Runs in a worker thread — Pillow and libvips
+    release the GIL while decoding and encoding.
+    """
+    tif_path, webp_path = job
+    tags = [f"q85-{edge}" for edge in WEBP_SIZES]
+    tags.append(f"thumb-q{THUMB_QUALITY}-{THUMB_BOX[0]}x{THUMB_BOX[1]}")
+    cache_paths = cache_paths_for(tif_path, tags, ".webp")
+    if all(os.path.exists(p) for p in cache_paths):
+        w, h = get_image_dims(cache_paths[0])
+    else:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_paths = [f"{p}.{os.getpid()}.tmp" for p in cache_paths]
+        try:
+            w, h = convert_tif_to_webp(tif_path, tmp_paths[:-1], tmp_paths[-1])
+        except BaseException:
+            for tmp_path in tmp_paths:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            raise
+        for tmp_path, cache_path in zip(tmp_paths, cache_paths):
+            os.replace(tmp_path, cache_path)
+
+    img_dir, webp_name = os.path.split(webp_path)
+    for name, cache_path in zip(output_names(webp_name), cache_paths):
+        link_or_copy(cache_path, os.path.join(img_dir, name))
     return w, h
 
 
+def discover_dataset(ds, data_dir, img_dir):
+    """Find one dataset's edited TIFs and plan their conversions.
+
+    Returns (dataset, jobs): the dataset's template entry (sites → images;
+    dims are filled in after conversion) and its (tif_path, webp_path)
+    pairs in image order.  dataset is None if there are no TIFs.
+    """
+    ds_id = ds["id"]
+    site_files = discover_files(os.path.join(data_dir, ds_id, "edited"))
+    if not site_files:
+        return None, []
+
+    sites_data = []
+    jobs = []
+    for site in sorted(site_files):
+        files = sorted(site_files[site], key=lambda x: natural_sort_key(x[0]))
+        images = []
+        for transect, tif_path in files:
+            webp_name = f"{ds_id}_{site}_{transect}.webp"
+            jobs.append((tif_path, os.path.join(img_dir, webp_name)))
+            images.append({"transect": transect, "filename": webp_name,
+                           "thumb": thumb_name(webp_name)})
+        sites_data.append({"code": site, "images": images})
+
+    return {"id": ds_id, "label": ds["label"], "sites": sites_data}, jobs
+
+
+def install_asset(name, output_dir):
+    """Copy a static asset from TEMPLATE_DIR to output_dir unless unchanged."""
+    src_path = os.path.join(TEMPLATE_DIR, name)
+    dest_path = os.path.join(output_dir, name)
+    if not (os.path.exists(dest_path) and filecmp.cmp(src_path, dest_path, shallow=False)):
+        shutil.copyfile(src_path, dest_path)
+
+
+def wall_variant(img, edge):
+    """Filename to serve for img's `edge`-px wall size.
+
+    The main file when the image already fits, since that variant is only
+    a link to it and the lightbox then reuses what the wall downloaded.
+    """
+    if max(img["w"], img["h"]) <= edge:
+        return img["filename"]
+    return webp_variant(img["filename"], edge)
+
+
+def srcset(img):
+    """srcset value offering every WALL_SIZES variant of img.
+
+    Returns "" when the image is no bigger than the smallest variant.
+    """
+    long_edge = max(img["w"], img["h"])
+    if long_edge <= WALL_SIZES[-1]:
+        return ""
+    candidates = []
+    for edge in reversed(WALL_SIZES):
+        width = round(img["w"] * min(1, edge / long_edge))
+        candidates.append(f'images/{wall_variant(img, edge)} {width}w')
+    return ", ".join(candidates)
+
+
 def main():
     parser = argparse.ArgumentParser(description="Generate TCRMP orthomosaic HTML gallery.")
     parser.add_argument("--data-dir", default="data",
@@ -110,584 +379,87 @@ def main():
     with open(args.datasets) as f:
         datasets_config = json.load(f)
 
-    if os.path.exists(output_dir):
-        shutil.rmtree(output_dir)
     os.makedirs(img_dir, exist_ok=True)
 
-    # Process all datasets
     all_datasets = []
     all_images_for_hero = []
-
-    for ds in datasets_config:
-        ds_id = ds["id"]
-        ds_label = ds["label"]
-        src_dir = os.path.join(data_dir, ds_id, "edited")
-
-        print(f"\n=== {ds_label} ({src_dir}) ===")
-        site_files = discover_files(src_dir)
-        if not site_files:
-            print("  No files found, skipping.")
-            continue
-
-        sorted_sites = sorted(site_files.keys())
-        total = sum(len(v) for v in site_files.values())
-        print(f"  {len(sorted_sites)} sites, {total} images")
-
-        sites_data = []
-        for site in sorted_sites:
-            files = sorted(site_files[site], key=lambda x: natural_sort_key(x[0]))
-            images = []
-            for transect, tif_path in files:
-                webp_name = f"{ds_id}_{site}_{transect}.webp"
-                webp_path = os.path.join(img_dir, webp_name)
-                print(f"    Converting {site} {transect}...")
-                w, h = get_image_dims(tif_path)
-                convert_tif_to_webp(tif_path, webp_path)
-                img_data = {
-                    "transect": transect,
-                    "filename": webp_name,
-                    "w": w, "h": h,
-                    "aspect": round(w / h, 4),
-                }
-                images.append(img_data)
-                all_images_for_hero.append(img_data)
-            sites_data.append({"code": site, "images": images})
-
-        all_datasets.append({"id": ds_id, "label": ds_label, "sites": sites_data})
-
-    if not all_datasets:
-        print("No datasets found. Nothing to generate.")
-        return 1
+    jobs = []
+
+    with ThreadPoolExecutor(max_workers=CONVERT_WORKERS) as ex:
+        # Datasets are independent, so scan every edited/ dir at once; the
+        # conversions below then share the same pool.
+        discovered = ex.map(discover_dataset, datasets_config,
+                            repeat(data_dir), repeat(img_dir))
+        for ds, (dataset, ds_jobs) in zip(datasets_config, discovered):
+            print(f"\n=== {ds['label']} ({os.path.join(data_dir, ds['id'], 'edited')}) ===")
+            if dataset is None:
+                print("  No files found, skipping.")
+                continue
+            images = [img for site in dataset["sites"] for img in site["images"]]
+            print(f"  {len(dataset['sites'])} sites, {len(images)} images")
+            all_datasets.append(dataset)
+            all_images_for_hero.extend(images)
+            jobs.extend(ds_jobs)
+
+        if not all_datasets:
+            print("No datasets found. Nothing to generate.")
+            return 1
+
+        # Rebuild incrementally: drop images no dataset produces any more
+        # and leave the rest for convert_job to refresh only if stale.
+        desired = {name for _, webp_path in jobs
+                   for name in output_names(os.path.basename(webp_path))}
+        for name in os.listdir(img_dir):
+            if name not in desired:
+                print(f"    Removing stale {name}")
+                os.remove(os.path.join(img_dir, name))
+
+        print(f"\nConverting {len(jobs)} images...")
+        failed = 0
+        futures = [ex.submit(convert_job, job) for job in jobs]
+        for img_data, (tif_path, _), fut in zip(all_images_for_hero, jobs, futures):
+            try:
+                w, h = fut.result()
+            except DECODE_ERRORS as e:
+                print(f"    Skipping {tif_path}: {e}")
+                print("      (re-export it from Lightroom; as 8-bit if it is 16-bit)")
+                failed += 1
+                continue
+            print(f"    Converted {img_data['filename']}")
+            img_data["w"] = w
+            img_data["h"] = h
+            img_data["aspect"] = round(w / h, 4)
+            img_data["wall"] = wall_variant(img_data, WALL_SIZES[0])
+            img_data["srcset"] = srcset(img_data)
+
+    # Leave out images that couldn't be converted, and any site or dataset
+    # left empty, rather than failing the whole gallery
+    if failed:
+        all_images_for_hero = [img for img in all_images_for_hero if "w" in img]
+        for dataset in all_datasets:
+            for site in dataset["sites"]:
+                site["images"] = [img for img in site["images"] if "w" in img]
+            dataset["sites"] = [site for site in dataset["sites"] if site["images"]]
+        all_datasets = [dataset for dataset in all_datasets if dataset["sites"]]
+        if not all_datasets:
+            print("No images could be converted. Nothing to generate.")
+            return 1
 
     # --- Build HTML ---
     print("\nGenerating HTML...")
 
-    hero_tiles = ""
-    for img in all_images_for_hero:
-        hero_tiles += f'      <div class="hero-tile" style="flex: {img["aspect"]} 1 0%;">'
-        hero_tiles += f'<img src="images/{img["filename"]}" alt="" loading="eager"></div>\n'
-
-    dataset_nav = ""
-    dataset_content = ""
-
-    for ds in all_datasets:
-        ds_id = ds["id"]
-        ds_label = ds["label"]
-        dataset_nav += f'      <a href="#ds-{ds_id}" class="ds-pill">{ds_label}</a>\n'
-
-        site_nav = ""
-        for site in ds["sites"]:
-            site_nav += f'        <a href="#s-{ds_id}-{site["code"]}">{site["code"]}</a>\n'
-
-        site_sections = ""
-        for site in ds["sites"]:
-            site_id = f's-{ds_id}-{site["code"]}'
-            tiles = ""
-            for img in site["images"]:
-                esc_label = f'{site["code"]} {img["transect"]} — {ds_label}'
-                tiles += f'          <div class="wall-tile" '
-                tiles += f'onclick="openViewer(\'images/{img["filename"]}\', \'{esc_label}\')">\n'
-                tiles += f'            <img src="images/{img["filename"]}" alt="{esc_label}" loading="lazy">\n'
-                tiles += f'            <span class="label">{img["transect"]}</span>\n'
-                tiles += f'          </div>\n'
-            site_sections += f'      <div class="site-block" id="{site_id}">\n'
-            site_sections += f'        <div class="site-name">{site["code"]}</div>\n'
-            site_sections += f'        <div class="wall-stack">\n{tiles}        </div>\n'
-            site_sections += f'      </div>\n'
-
-        dataset_content += f"""
-    <section class="dataset" id="ds-{ds_id}">
-      <div class="ds-bar">
-        <span class="ds-title">{ds_label}</span>
-        <div class="ds-sites">
-{site_nav}        </div>
-      </div>
-{site_sections}    </section>
-"""
+    # Autoescaping covers ids/labels from datasets.json; stream() renders
+    # block by block straight into the buffered file.
+    env = Environment(loader=FileSystemLoader(TEMPLATE_DIR), autoescape=True,
+                      trim_blocks=True, lstrip_blocks=True, auto_reload=False)
+    template = env.get_template("gallery.html.j2")
 
-    html = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-<meta charset="UTF-8">
-<meta name="viewport" content="width=device-width, initial-scale=1.0">
-<title>TCRMP Orthomosaics</title>
-<style>
-  * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-
-  body {{
-    font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, sans-serif;
-    background: #0a0a0a;
-    color: #ccc;
-    overflow-x: hidden;
-  }}
-
-  /* ========== HERO WALL ========== */
-  .hero {{
-    position: relative;
-    width: 100%;
-    overflow: hidden;
-  }}
-
-  .hero-mosaic {{
-    display: flex;
-    flex-wrap: wrap;
-    gap: 0;
-    width: 100%;
-  }}
-
-  .hero-tile {{
-    height: 180px;
-    overflow: hidden;
-    position: relative;
-  }}
-
-  .hero-tile img {{
-    width: 100%;
-    height: 100%;
-    object-fit: cover;
-    display: block;
-    filter: brightness(0.55) saturate(1.1);
-  }}
-
-  .hero-overlay {{
-    position: absolute;
-    inset: 0;
-    display: flex;
-    flex-direction: column;
-    align-items: center;
-    justify-content: center;
-    background: linear-gradient(
-      180deg,
-      rgba(10,10,10,0.3) 0%,
-      rgba(10,10,10,0.1) 40%,
-      rgba(10,10,10,0.1) 60%,
-      rgba(10,10,10,0.6) 100%
-    );
-    pointer-events: none;
-  }}
-
-  .hero-title {{
-    font-size: 3rem;
-    font-weight: 800;
-    color: #fff;
-    letter-spacing: 0.08em;
-    text-shadow: 0 2px 30px rgba(0,0,0,0.7);
-  }}
-
-  .hero-sub {{
-    font-size: 1rem;
-    color: rgba(255,255,255,0.65);
-    margin-top: 0.4rem;
-    letter-spacing: 0.15em;
-    text-transform: uppercase;
-    font-weight: 500;
-  }}
-
-  /* ========== STICKY NAV ========== */
-  .topnav {{
-    position: sticky;
-    top: 0;
-    z-index: 200;
-    background: rgba(10,10,10,0.88);
-    backdrop-filter: blur(14px);
-    -webkit-backdrop-filter: blur(14px);
-    border-bottom: 1px solid rgba(255,255,255,0.06);
-    padding: 0.55rem 1.5rem;
-    display: flex;
-    align-items: center;
-    gap: 1.2rem;
-  }}
-
-  .topnav .brand {{
-    font-weight: 700;
-    font-size: 0.85rem;
-    color: rgba(255,255,255,0.5);
-    white-space: nowrap;
-    letter-spacing: 0.06em;
-    text-transform: uppercase;
-  }}
-
-  .topnav .ds-pills {{
-    display: flex;
-    gap: 0.35rem;
-  }}
-
-  .ds-pill {{
-    color: #7ab8ff;
-    text-decoration: none;
-    font-size: 0.82rem;
-    font-weight: 600;
-    padding: 0.2rem 0.65rem;
-    border-radius: 3px;
-    transition: all 0.12s;
-  }}
-
-  .ds-pill:hover {{
-    color: #fff;
-    background: rgba(255,255,255,0.08);
-  }}
-
-  /* ========== DATASET SECTION ========== */
-  .dataset {{
-    margin-bottom: 0.5rem;
-  }}
-
-  .ds-bar {{
-    display: flex;
-    align-items: center;
-    gap: 1.2rem;
-    padding: 1rem 1.5rem 0.5rem;
-  }}
-
-  .ds-title {{
-    font-size: 1.3rem;
-    font-weight: 800;
-    color: #fff;
-    letter-spacing: 0.04em;
-    white-space: nowrap;
-  }}
-
-  .ds-sites {{
-    display: flex;
-    flex-wrap: wrap;
-    gap: 0.25rem;
-  }}
-
-  .ds-sites a {{
-    color: rgba(255,255,255,0.45);
-    text-decoration: none;
-    font-size: 0.75rem;
-    font-weight: 600;
-    padding: 0.12rem 0.45rem;
-    border-radius: 2px;
-    transition: all 0.12s;
-    letter-spacing: 0.03em;
-  }}
-
-  .ds-sites a:hover {{
-    color: #fff;
-    background: rgba(255,255,255,0.08);
-  }}
-
-  /* ========== SITE BLOCKS ========== */
-  .site-block {{
-    margin-bottom: 2px;
-  }}
-
-  .site-name {{
-    font-size: 0.7rem;
-    font-weight: 700;
-    color: rgba(255,255,255,0.3);
-    letter-spacing: 0.1em;
-    text-transform: uppercase;
-    padding: 0.8rem 1.5rem 0.3rem;
-  }}
-
-  /* ========== IMAGE WALL — vertical stack, full aspect ratio ========== */
-  .wall-stack {{
-    display: flex;
-    flex-direction: column;
-    gap: 0;
-  }}
-
-  .wall-tile {{
-    position: relative;
-    cursor: pointer;
-    overflow: hidden;
-    line-height: 0;
-    border-bottom: 1px solid rgba(255,255,255,0.08);
-  }}
-
-  .wall-tile:last-child {{
-    border-bottom: none;
-  }}
-
-  .wall-tile img {{
-    width: 100%;
-    height: auto;
-    display: block;
-    transition: filter 0.25s;
-  }}
-
-  .wall-tile:hover img {{
-    filter: brightness(1.15);
-  }}
-
-  .wall-tile .label {{
-    position: absolute;
-    top: 0.4rem;
-    left: 0.6rem;
-    padding: 0.15rem 0.5rem;
-    font-size: 0.75rem;
-    font-weight: 700;
-    color: #fff;
-    background: rgba(0,0,0,0.5);
-    border-radius: 2px;
-    pointer-events: none;
-    letter-spacing: 0.05em;
-    opacity: 0.5;
-    transition: opacity 0.2s;
-  }}
-
-  .wall-tile:hover .label {{
-    opacity: 1;
-  }}
-
-  /* ========== LIGHTBOX ========== */
-  .viewer-overlay {{
-    display: none;
-    position: fixed;
-    inset: 0;
-    background: rgba(0,0,0,0.96);
-    z-index: 1000;
-    flex-direction: column;
-  }}
-
-  .viewer-overlay.active {{
-    display: flex;
-  }}
-
-  .viewer-topbar {{
-    display: flex;
-    align-items: center;
-    justify-content: space-between;
-    padding: 0.5rem 1rem;
-    flex-shrink: 0;
-  }}
-
-  .viewer-title {{
-    font-size: 0.95rem;
-    font-weight: 600;
-    color: rgba(255,255,255,0.8);
-  }}
-
-  .viewer-controls {{
-    display: flex;
-    gap: 0.35rem;
-  }}
-
-  .viewer-controls button {{
-    background: none;
-    border: 1px solid rgba(255,255,255,0.15);
-    color: rgba(255,255,255,0.7);
-    width: 32px;
-    height: 32px;
-    border-radius: 4px;
-    cursor: pointer;
-    font-size: 1rem;
-    display: flex;
-    align-items: center;
-    justify-content: center;
-    transition: background 0.12s, color 0.12s;
-  }}
-
-  .viewer-controls button:hover {{
-    background: rgba(255,255,255,0.1);
-    color: #fff;
-  }}
-
-  .viewer-canvas {{
-    flex: 1;
-    overflow: hidden;
-    position: relative;
-    cursor: grab;
-  }}
-
-  .viewer-canvas.dragging {{
-    cursor: grabbing;
-  }}
-
-  .viewer-canvas img {{
-    position: absolute;
-    transform-origin: 0 0;
-    max-width: none;
-    max-height: none;
-    user-select: none;
-    -webkit-user-drag: none;
-  }}
-
-  .zoom-hint {{
-    position: absolute;
-    bottom: 1rem;
-    left: 50%;
-    transform: translateX(-50%);
-    color: rgba(255,255,255,0.3);
-    font-size: 0.75rem;
-    pointer-events: none;
-    transition: opacity 0.4s;
-  }}
-
-  /* ========== FOOTER ========== */
-  footer {{
-    padding: 2rem 1.5rem;
-    text-align: center;
-    color: rgba(255,255,255,0.15);
-    font-size: 0.7rem;
-    letter-spacing: 0.05em;
-  }}
-</style>
-</head>
-<body>
-
-<!-- Hero wall -->
-<div class="hero">
-  <div class="hero-mosaic">
-{hero_tiles}  </div>
-  <div class="hero-overlay">
-    <div class="hero-title">TCRMP</div>
-    <div class="hero-sub">Territorial Coral Reef Monitoring Program &mdash; Orthomosaics</div>
-  </div>
-</div>
-
-<!-- Sticky nav -->
-<div class="topnav">
-  <span class="brand">TCRMP Ortho</span>
-  <div class="ds-pills">
-{dataset_nav}  </div>
-</div>
-
-<!-- Dataset sections -->
-{dataset_content}
-
-<footer>TCRMP Orthomosaic Gallery</footer>
-
-<!-- Lightbox -->
-<div class="viewer-overlay" id="viewer">
-  <div class="viewer-topbar">
-    <span class="viewer-title" id="viewerTitle"></span>
-    <div class="viewer-controls">
-      <button onclick="zoomBy(1.4)" title="Zoom in">+</button>
-      <button onclick="zoomBy(0.7)" title="Zoom out">&minus;</button>
-      <button onclick="resetView()" title="Fit to screen">&#8634;</button>
-      <button onclick="closeViewer()" title="Close">&times;</button>
-    </div>
-  </div>
-  <div class="viewer-canvas" id="viewerCanvas">
-    <img id="viewerImg" draggable="false">
-    <div class="zoom-hint" id="zoomHint">scroll to zoom &middot; drag to pan &middot; double-click to toggle &middot; esc to close</div>
-  </div>
-</div>
-
-<script>
-const viewer = document.getElementById('viewer');
-const viewerImg = document.getElementById('viewerImg');
-const viewerCanvas = document.getElementById('viewerCanvas');
-const viewerTitle = document.getElementById('viewerTitle');
-const zoomHint = document.getElementById('zoomHint');
-
-let scale = 1, tx = 0, ty = 0;
-let isDragging = false, dragStartX, dragStartY, dragTxStart, dragTyStart;
-let hintTimeout;
-
-function openViewer(src, title) {{
-  viewerTitle.textContent = title;
-  viewerImg.src = src;
-  viewer.classList.add('active');
-  document.body.style.overflow = 'hidden';
-  zoomHint.style.opacity = '1';
-  clearTimeout(hintTimeout);
-  hintTimeout = setTimeout(() => zoomHint.style.opacity = '0', 3500);
-  viewerImg.onload = () => resetView();
-}}
-
-function closeViewer() {{
-  viewer.classList.remove('active');
-  document.body.style.overflow = '';
-  viewerImg.src = '';
-}}
-
-function resetView() {{
-  const cw = viewerCanvas.clientWidth;
-  const ch = viewerCanvas.clientHeight;
-  const iw = viewerImg.naturalWidth;
-  const ih = viewerImg.naturalHeight;
-  scale = Math.min(cw / iw, ch / ih, 1);
-  tx = (cw - iw * scale) / 2;
-  ty = (ch - ih * scale) / 2;
-  applyTransform();
-}}
-
-function zoomBy(factor, cx, cy) {{
-  if (cx === undefined) {{
-    cx = viewerCanvas.clientWidth / 2;
-    cy = viewerCanvas.clientHeight / 2;
-  }}
-  const newScale = Math.max(0.02, Math.min(scale * factor, 50));
-  const ratio = newScale / scale;
-  tx = cx - ratio * (cx - tx);
-  ty = cy - ratio * (cy - ty);
-  scale = newScale;
-  applyTransform();
-}}
-
-function applyTransform() {{
-  viewerImg.style.transform = `translate(${{tx}}px, ${{ty}}px) scale(${{scale}})`;
-}}
-
-viewerCanvas.addEventListener('wheel', (e) => {{
-  e.preventDefault();
-  const rect = viewerCanvas.getBoundingClientRect();
-  const cx = e.clientX - rect.left;
-  const cy = e.clientY - rect.top;
-  zoomBy(e.deltaY < 0 ? 1.15 : 0.87, cx, cy);
-}}, {{ passive: false }});
-
-viewerCanvas.addEventListener('mousedown', (e) => {{
-  if (e.button !== 0) return;
-  isDragging = true;
-  dragStartX = e.clientX;
-  dragStartY = e.clientY;
-  dragTxStart = tx;
-  dragTyStart = ty;
-  viewerCanvas.classList.add('dragging');
-}});
-
-window.addEventListener('mousemove', (e) => {{
-  if (!isDragging) return;
-  tx = dragTxStart + (e.clientX - dragStartX);
-  ty = dragTyStart + (e.clientY - dragStartY);
-  applyTransform();
-}});
-
-window.addEventListener('mouseup', () => {{
-  isDragging = false;
-  viewerCanvas.classList.remove('dragging');
-}});
-
-viewerCanvas.addEventListener('dblclick', (e) => {{
-  const rect = viewerCanvas.getBoundingClientRect();
-  const cx = e.clientX - rect.left;
-  const cy = e.clientY - rect.top;
-  const fitScale = Math.min(
-    viewerCanvas.clientWidth / viewerImg.naturalWidth,
-    viewerCanvas.clientHeight / viewerImg.naturalHeight, 1
-  );
-  if (scale > fitScale * 1.5) {{
-    resetView();
-  }} else {{
-    zoomBy(3, cx, cy);
-  }}
-}});
-
-document.addEventListener('keydown', (e) => {{
-  if (!viewer.classList.contains('active')) return;
-  if (e.key === 'Escape') closeViewer();
-  if (e.key === '+' || e.key === '=') zoomBy(1.4);
-  if (e.key === '-') zoomBy(0.7);
-  if (e.key === '0') resetView();
-}});
-
-viewer.addEventListener('click', (e) => {{
-  if (e.target === viewer) closeViewer();
-}});
-</script>
-
-</body>
-</html>"""
+    for name in STATIC_ASSETS:
+        install_asset(name, output_dir)
 
     output_html = os.path.join(output_dir, "index.html")
-    with open(output_html, "w") as f:
-        f.write(html)
+    with open(output_html, "w", buffering=1 << 20) as out:
+        template.stream(datasets=all_datasets, hero_images=all_images_for_hero).dump(out)
 
     print(f"\nDone! Open:\n  {output_html}")
     return 0
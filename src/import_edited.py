@@ -3,10 +3,13 @@
 Step 3: Import edited TIFs back into the project under a project directory.
 
 Copies edited files from a source directory into data/{PROJECT_DIR}/edited/
-so they can be picked up by the gallery and PPTX generators.
+so they can be picked up by the gallery and PPTX generators, and adds
+the project to datasets.json if it isn't listed yet (not with --dest).
 
 Existing files are NEVER overwritten unless you pass --force, so you can
-safely add more batches to the same project over time.
+safely add more batches to the same project over time.  Each file only
+appears under its final name once fully copied, so an interrupted import
+can simply be re-run.
 
 If you omit project_dir, the script reads it from .current_project (set
 automatically by copy_orthomosaics.py).
@@ -19,14 +22,43 @@ Examples:
     python3 import_edited.py /path/to/lightroom/exports 2025_annual
     python3 import_edited.py ~/exports/batch2 2025_annual              # adds to existing project
     python3 import_edited.py ~/exports/retakes 2025_annual --force     # allows overwriting
+    python3 import_edited.py ~/exports/batch3 2025_annual -j 1         # one file at a time
 """
 
 import argparse
+import ctypes
+import errno
+import json
 import os
 import re
 import shutil
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 PROJECT_FILE = ".current_project"
+DATASETS_FILE = "datasets.json"
+
+# Matched against all candidate names joined by newlines, so one findall
+# call filters the whole directory
+FULL_TIF_LINES_RE = re.compile(r'^[A-Z]{3}_T\d+(?:_\d+)?_full\.tif$', re.MULTILINE)
+
+# copyfile(3) flags from <copyfile.h> (macOS)
+COPYFILE_STAT = 1 << 1
+COPYFILE_XATTR = 1 << 2
+COPYFILE_DATA = 1 << 3
+COPYFILE_CLONE = 1 << 24
+
+# Buffer size bounds for the read/write fallback; within them the size is
+# 16 blocks of the source filesystem's preferred I/O size
+COPY_BUFSIZE_MIN = 1 << 20
+COPY_BUFSIZE_MAX = 8 << 20
+
+# ioctl(2) request from <linux/fs.h>: reflink a whole file
+FICLONE = 0x40049409
+
+# Errors meaning "this copy method isn't available here" — try the next one
+COPY_UNSUPPORTED = {errno.EINVAL, errno.ENOSYS, errno.EOPNOTSUPP,
+                    errno.EPERM, errno.EXDEV}
 
 
 def load_current_project():
@@ -37,6 +69,250 @@ def load_current_project():
     return None
 
 
+def update_datasets_json(project_dir, label, path=DATASETS_FILE):
+    """Add {"id": project_dir, "label": label} to datasets.json if missing.
+
+    Creates the file if needed.  Existing entries are left untouched, and
+    the file is rewritten via a temp file and os.replace so the gallery
+    never reads a half-written config.  Returns True if an entry was added;
+    raises ValueError if the file isn't a JSON list of objects.
+    """
+    datasets = []
+    if os.path.isfile(path):
+        with open(path, encoding="utf-8") as f:
+            datasets = json.load(f)
+        if not (isinstance(datasets, list)
+                and all(isinstance(ds, dict) for ds in datasets)):
+            raise ValueError("expected a list of {\"id\": ..., \"label\": ...} objects")
+    if any(ds.get("id") == project_dir for ds in datasets):
+        return False
+
+    datasets.append({"id": project_dir, "label": label})
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            # One entry per line, matching the hand-written file
+            f.write("[\n")
+            f.write(",\n".join("  " + json.dumps(ds, ensure_ascii=False) for ds in datasets))
+            f.write("\n]\n")
+        os.replace(tmp_path, path)
+    except OSError:
+        if os.path.lexists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return True
+
+
+def advise(fd, advice):
+    """posix_fadvise the whole file where supported; the hint is optional."""
+    if hasattr(os, "posix_fadvise"):
+        try:
+            os.posix_fadvise(fd, 0, 0, getattr(os, advice))
+        except OSError:
+            pass
+
+
+def copy_data(fsrc, fdst, size):
+    """Copy everything from open file fsrc (`size` bytes long) to fdst.
+
+    On Linux, tries a FICLONE reflink first (instant on btrfs/XFS), then
+    copy_file_range (in-kernel; server-side on NFS 4.2), then sendfile.
+    Each method the filesystem rejects, or that stops short of `size`
+    (some FUSE and pseudo filesystems report EOF straight away), hands
+    over to the next, resuming where it stopped.  Elsewhere, or if all
+    are rejected, a readinto() loop over one reusable buffer, sized from
+    the source's st_blksize, finishes the job.  The source is read with sequential readahead and
+    both files are dropped from the page cache afterwards.
+    """
+    in_fd, out_fd = fsrc.fileno(), fdst.fileno()
+    advise(in_fd, "POSIX_FADV_SEQUENTIAL")
+    try:
+        offset = 0
+        if sys.platform == "linux":
+            import fcntl
+            try:
+                fcntl.ioctl(out_fd, FICLONE, in_fd)
+                return
+            except OSError:
+                pass  # not a CoW filesystem, or src/dst on different ones
+
+            try:
+                if hasattr(os, "copy_file_range"):
+                    while n := os.copy_file_range(in_fd, out_fd, 2**30, offset, offset):
+                        offset += n
+            except OSError as e:
+                if e.errno not in COPY_UNSUPPORTED:
+                    raise
+            if offset >= size:
+                return
+
+            # sendfile writes at out_fd's position; copy_file_range left it at 0
+            os.lseek(out_fd, offset, os.SEEK_SET)
+            try:
+                while sent := os.sendfile(out_fd, in_fd, offset, 2**30):
+                    offset += sent
+            except OSError as e:
+                if e.errno not in COPY_UNSUPPORTED:
+                    raise
+            if offset >= size:
+                return
+            fsrc.seek(offset)
+            fdst.seek(offset)
+
+        blksize = getattr(os.fstat(in_fd), "st_blksize", 0)  # absent on Windows
+        bufsize = min(max(blksize * 16, COPY_BUFSIZE_MIN), COPY_BUFSIZE_MAX)
+        buf = memoryview(bytearray(bufsize))
+        while True:
+            n = fsrc.readinto(buf)
+            if not n:
+                return
+            fdst.write(buf[:n])
+    finally:
+        # Each TIF is read once; drop its pages (and the written copy's)
+        # so a batch of GB-scale files doesn't evict hotter cache
+        fdst.flush()
+        advise(in_fd, "POSIX_FADV_DONTNEED")
+        advise(out_fd, "POSIX_FADV_DONTNEED")
+
+
+def fast_copy(src_path, dst_path, size):
+    """Copy a file's data and metadata like shutil.copy2, but kernel-side.
+
+    On macOS, copyfile(3) with COPYFILE_CLONE clones on APFS and otherwise
+    copies in the kernel; on Windows, CopyFileExW does the same job.
+    Elsewhere the data goes through copy_data and the metadata through
+    shutil.copystat.  The platform calls fall back to shutil.copy2.
+    """
+    if sys.platform == "darwin":
+        libc = ctypes.CDLL("/usr/lib/libSystem.B.dylib", use_errno=True)
+        flags = COPYFILE_CLONE | COPYFILE_DATA | COPYFILE_STAT | COPYFILE_XATTR
+        if libc.copyfile(os.fsencode(src_path), os.fsencode(dst_path),
+                         None, ctypes.c_uint32(flags)) != 0:
+            shutil.copy2(src_path, dst_path)
+        return
+
+    if sys.platform == "win32":
+        # CopyFileExW carries attributes and timestamps over itself
+        if not ctypes.windll.kernel32.CopyFileExW(src_path, dst_path, None, None, None, 0):
+            shutil.copy2(src_path, dst_path)
+        return
+
+    with open(src_path, "rb") as fsrc, open(dst_path, "wb") as fdst:
+        copy_data(fsrc, fdst, size)
+    shutil.copystat(src_path, dst_path)
+
+
+def fsync_path(path):
+    """fsync a file or (on POSIX) a directory by path."""
+    if os.path.isdir(path) and sys.platform == "win32":
+        return  # directories can't be opened for fsync on Windows
+    fd = os.open(path, os.O_RDONLY if os.path.isdir(path) else os.O_RDWR)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def link_tmpfile(fd, dst_path):
+    """Link the O_TMPFILE open as fd into place as dst_path.
+
+    Passing a dir_fd makes os.link call linkat(AT_SYMLINK_FOLLOW), which
+    follows the /proc/self/fd magic link to the file; without one it
+    calls plain link(2), which doesn't and fails with EXDEV.
+    """
+    dir_fd = os.open(os.path.dirname(dst_path) or ".", os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.link(f"/proc/self/fd/{fd}", os.path.basename(dst_path),
+                dst_dir_fd=dir_fd, follow_symlinks=True)
+    finally:
+        os.close(dir_fd)
+
+
+def tmpfile_linkable(dest_dir):
+    """Whether an O_TMPFILE in dest_dir can be linked into place.
+
+    Probed once, with an empty file, before any copy starts: some
+    filesystems lack O_TMPFILE, and some kernels and sandboxes refuse
+    linkat via /proc (EXDEV).  Linux only.
+    """
+    if sys.platform != "linux" or not hasattr(os, "O_TMPFILE"):
+        return False
+    try:
+        fd = os.open(dest_dir, os.O_TMPFILE | os.O_WRONLY, 0o644)
+    except OSError:
+        return False
+    probe_path = os.path.join(dest_dir, f".import_probe.{os.getpid()}")
+    try:
+        link_tmpfile(fd, probe_path)
+    except OSError:
+        return False
+    else:
+        os.remove(probe_path)
+        return True
+    finally:
+        os.close(fd)
+
+
+def import_file(src_path, dst_path, size, use_tmpfile=False, durable=False):
+    """Copy src_path (`size` bytes) to dst_path, never seen half-written.
+
+    A crash mid-copy would otherwise leave a truncated TIF that later runs
+    skip as "already present".  With use_tmpfile (see tmpfile_linkable)
+    the data goes into an unnamed O_TMPFILE in the destination directory,
+    which is linked into place only once complete.  Otherwise it is
+    written to dst_path + ".part" and renamed over dst_path; the .part is
+    removed if the copy fails.  With durable=True the file and directory
+    are fsynced before returning.
+    """
+    dest_dir = os.path.dirname(dst_path) or "."
+    tmp_path = dst_path + ".part"
+
+    fd = None
+    if use_tmpfile:
+        try:
+            fd = os.open(dest_dir, os.O_TMPFILE | os.O_WRONLY, 0o644)
+        except OSError:
+            pass  # e.g. out of inodes; the .part path reports real errors
+
+    try:
+        if fd is not None:
+            proc_path = f"/proc/self/fd/{fd}"
+            with open(fd, "wb") as fdst, open(src_path, "rb") as fsrc:
+                copy_data(fsrc, fdst, size)
+                fdst.flush()
+                shutil.copystat(src_path, proc_path)
+                if durable:
+                    os.fsync(fd)
+                if os.path.lexists(dst_path):
+                    # --force over an existing file: name it, then swap it in
+                    if os.path.lexists(tmp_path):
+                        os.remove(tmp_path)
+                    link_tmpfile(fd, tmp_path)
+                    os.replace(tmp_path, dst_path)
+                else:
+                    link_tmpfile(fd, dst_path)
+        else:
+            fast_copy(src_path, tmp_path, size)
+            if durable:
+                fsync_path(tmp_path)
+            os.replace(tmp_path, dst_path)
+    except BaseException:
+        if os.path.lexists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    if durable:
+        fsync_path(dest_dir)
+
+
+def positive_int(value):
+    """argparse type for counts that must be at least 1."""
+    n = int(value)
+    if n < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return n
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Import edited orthomosaic TIFs into data/{PROJECT_DIR}/edited/."
@@ -61,6 +337,18 @@ def main():
         action="store_true",
         help="Overwrite existing files (default: skip files that already exist)"
     )
+    parser.add_argument(
+        "--parallel", "--jobs", "-j",
+        type=positive_int,
+        default=4,
+        help="Number of files to import concurrently (default: 4; use 1 for spinning disks, "
+             "more for NVMe or fast network storage)"
+    )
+    parser.add_argument(
+        "--durable",
+        action="store_true",
+        help="fsync each imported file before moving on (slower; survives power loss)"
+    )
     args = parser.parse_args()
 
     source_dir = args.source_dir
@@ -77,44 +365,109 @@ def main():
         print(f"Error: source directory not found: {source_dir}")
         return 1
 
-    # Find valid ortho files
-    pattern = re.compile(r'^[A-Z]{3}_T\d+(?:_\d+)?_full\.tif$')
-    files = sorted(f for f in os.listdir(source_dir) if pattern.match(f))
+    # Find valid ortho files; copy order doesn't matter, so no sort here.
+    # Names without the fixed "XXX_T" shape are dropped before the regex.
+    with os.scandir(source_dir) as it:
+        candidates = {e.name: e for e in it if e.name[3:5] == "_T"}
+    entries = [candidates[name]
+               for name in FULL_TIF_LINES_RE.findall("\n".join(candidates))
+               if name in candidates and candidates[name].is_file()]
 
-    if not files:
+    if not entries:
         print(f"No files matching SITE_TRANSECT_full.tif found in {source_dir}")
         return 1
 
     os.makedirs(dest_dir, exist_ok=True)
+    # One listdir answers "already there?" for every file; only --force
+    # needs a stat, and only for names that are present
+    existing = frozenset(os.listdir(dest_dir))
 
-    copied = 0
     skipped = 0
+    jobs = []
 
-    for fname in files:
-        src_path = os.path.join(source_dir, fname)
-        dst_path = os.path.join(dest_dir, fname)
-
-        if os.path.exists(dst_path):
-            if not args.force:
-                skipped += 1
-                continue
-            # --force: overwrite only if source is newer
-            if os.path.getmtime(dst_path) >= os.path.getmtime(src_path):
-                skipped += 1
-                continue
-
-        src_size = os.path.getsize(src_path) / (1024 * 1024)
-        print(f"  Importing {fname} ({src_size:.0f} MB)...")
-        shutil.copy2(src_path, dst_path)
-        copied += 1
-
-    print(f"\nDone! {copied} imported, {skipped} already present.")
-    print(f"Project: {project_dir}  →  {dest_dir}")
+    for entry in entries:
+        src_st = entry.stat()
+        dst_path = os.path.join(dest_dir, entry.name)
 
+        # Keep an existing file unless --force and the source is newer
+        if entry.name in existing and (
+                not args.force or os.stat(dst_path).st_mtime >= src_st.st_mtime):
+            skipped += 1
+            continue
+
+        jobs.append((entry.name, src_st.st_size, entry.path, dst_path))
+
+    # Copies are I/O-bound and run in the kernel, so a few threads overlap
+    # reads and writes across files.  Each worker sits in copy_file_range
+    # with the GIL released, so --parallel is effectively the I/O queue
+    # depth; raise it for NVMe or fast network storage.
+    if jobs:
+        print(f"  Importing {len(jobs)} files ({args.parallel} at a time)...")
+    # Decided once, before any copy, so no worker copies a file it then
+    # can't link; the workers only read it
+    use_tmpfile = bool(jobs) and tmpfile_linkable(dest_dir)
+    # A one-line progress mark is printed from this (main) thread as each
+    # copy finishes, so it never holds the GIL against the workers.  A
+    # failed copy doesn't stop the rest.
+    interrupted = False
+    with ThreadPoolExecutor(max_workers=args.parallel) as ex:
+        futures = {
+            ex.submit(import_file, src_path, dst_path, size, use_tmpfile, args.durable): (fname, size)
+            for fname, size, src_path, dst_path in jobs
+        }
+        try:
+            for done, fut in enumerate(as_completed(futures), 1):
+                fname, _ = futures[fut]
+                try:
+                    fut.result()
+                except OSError:
+                    print(f"  [{done}/{len(jobs)}] {fname} FAILED")
+                    continue
+                print(f"  [{done}/{len(jobs)}] {fname}")
+        except KeyboardInterrupt:
+            # Leaving the with block waits for the queue, which would start
+            # every remaining copy; drop those and finish the ones running
+            ex.shutdown(wait=False, cancel_futures=True)
+            print("\nInterrupted — finishing the imports in progress, then stopping.")
+            interrupted = True
+
+    # Every copy has stopped by now, so the per-file results are buffered
+    # and written in one go, including those still running at Ctrl-C.
+    # Sorted by name here, the only place order matters, so the log is
+    # the same from run to run.
+    log_lines = []
+    failed = 0
+    for fut, (fname, size) in sorted(futures.items(), key=lambda item: item[1][0]):
+        if fut.cancelled():
+            continue
+        if fut.exception() is not None:
+            log_lines.append(f"  FAILED {fname}: {fut.exception()}")
+            failed += 1
+        else:
+            log_lines.append(f"  Imported {fname} ({size >> 20} MB)")
+    if log_lines:
+        sys.stdout.write("\n" + "\n".join(log_lines) + "\n")
+    if interrupted:
+        return 130
+    copied = len(jobs) - failed
+
+    # The gallery only looks in data/{project_dir}/edited, so an import
+    # elsewhere (--dest) isn't registered, nor one where every copy failed
     label = project_dir.replace("_", " ").title()
-    print(f"\nTo include in the gallery, make sure datasets.json contains:")
-    print(f'  {{"id": "{project_dir}", "label": "{label}"}}')
-    return 0
+    added = False
+    if not args.dest and not (copied == 0 and failed):
+        try:
+            added = update_datasets_json(project_dir, label)
+        except (ValueError, OSError) as e:  # incl. json.JSONDecodeError
+            print(f"\nWarning: couldn't update {DATASETS_FILE} ({e}); "
+                  f"add {{\"id\": \"{project_dir}\", \"label\": \"{label}\"}} by hand.")
+
+    print(f"\nDone! {copied} imported, {skipped} already present."
+          + (f" {failed} FAILED — re-run to retry them." if failed else ""))
+    print(f"Project: {project_dir}  →  {dest_dir}")
+    if added:
+        print(f'Added {{"id": "{project_dir}", "label": "{label}"}} to {DATASETS_FILE}')
+    return 1 if failed else 0
 
 
 if __name__ == "__main__":
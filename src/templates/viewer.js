@@ -0,0 +1,117 @@
+const viewer = document.getElementById('viewer');
+const viewerImg = document.getElementById('viewerImg');
+const viewerCanvas = document.getElementById('viewerCanvas');
+const viewerTitle = document.getElementById('viewerTitle');
+const zoomHint = document.getElementById('zoomHint');
+
+let scale = 1, tx = 0, ty = 0;
+let isDragging = false, dragStartX, dragStartY, dragTxStart, dragTyStart;
+let hintTimeout;
+
+function openViewer(src, title) {
+  viewerTitle.textContent = title;
+  viewerImg.src = src;
+  viewer.classList.add('active');
+  document.body.style.overflow = 'hidden';
+  zoomHint.style.opacity = '1';
+  clearTimeout(hintTimeout);
+  hintTimeout = setTimeout(() => zoomHint.style.opacity = '0', 3500);
+  viewerImg.onload = () => resetView();
+}
+
+function closeViewer() {
+  viewer.classList.remove('active');
+  document.body.style.overflow = '';
+  viewerImg.src = '';
+}
+
+function resetView() {
+  const cw = viewerCanvas.clientWidth;
+  const ch = viewerCanvas.clientHeight;
+  const iw = viewerImg.naturalWidth;
+  const ih = viewerImg.naturalHeight;
+  scale = Math.min(cw / iw, ch / ih, 1);
+  tx = (cw - iw * scale) / 2;
+  ty = (ch - ih * scale) / 2;
+  applyTransform();
+}
+
+function zoomBy(factor, cx, cy) {
+  if (cx === undefined) {
+    cx = viewerCanvas.clientWidth / 2;
+    cy = viewerCanvas.clientHeight / 2;
+  }
+  const newScale = Math.max(0.02, Math.min(scale * factor, 50));
+  const ratio = newScale / scale;
+  tx = cx - ratio * (cx - tx);
+  ty = cy - ratio * (cy - ty);
+  scale = newScale;
+  applyTransform();
+}
+
+function applyTransform() {
+  viewerImg.style.transform = `translate(${tx}px, ${ty}px) scale(${scale})`;
+}
+
+viewerCanvas.addEventListener('wheel', (e) => {
+  e.preventDefault();
+  const rect = viewerCanvas.getBoundingClientRect();
+  const cx = e.clientX - rect.left;
+  const cy = e.clientY - rect.top;
+  zoomBy(e.deltaY < 0 ? 1.15 : 0.87, cx, cy);
+}, { passive: false });
+
+viewerCanvas.addEventListener('mousedown', (e) => {
+  if (e.button !== 0) return;
+  isDragging = true;
+  dragStartX = e.clientX;
+  dragStartY = e.clientY;
+  dragTxStart = tx;
+  dragTyStart = ty;
+  viewerCanvas.classList.add('dragging');
+});
+
+window.addEventListener('mousemove', (e) => {
+  if (!isDragging) return;
+  tx = dragTxStart + (e.clientX - dragStartX);
+  ty = dragTyStart + (e.clientY - dragStartY);
+  applyTransform();
+});
+
+window.addEventListener('mouseup', () => {
+  isDragging = false;
+  viewerCanvas.classList.remove('dragging');
+});
+
+viewerCanvas.addEventListener('dblclick', (e) => {
+  const rect = viewerCanvas.getBoundingClientRect();
+  const cx = e.clientX - rect.left;
+  const cy = e.clientY - rect.top;
+  const fitScale = Math.min(
+    viewerCanvas.clientWidth / viewerImg.naturalWidth,
+    viewerCanvas.clientHeight / viewerImg.naturalHeight, 1
+  );
+  if (scale > fitScale * 1.5) {
+    resetView();
+  } else {
+    zoomBy(3, cx, cy);
+  }
+});
+
+document.addEventListener('keydown', (e) => {
+  if (!viewer.classList.contains('active')) return;
+  if (e.key === 'Escape') closeViewer();
+  if (e.key === '+' || e.key === '=') zoomBy(1.4);
+  if (e.key === '-') zoomBy(0.7);
+  if (e.key === '0') resetView();
+});
+
+viewer.addEventListener('click', (e) => {
+  if (e.target === viewer) closeViewer();
+});
+
+// One delegated listener opens any wall tile from its data-* attributes.
+document.addEventListener('click', (e) => {
+  const tile = e.target.closest('.wall-tile');
+  if (tile) openViewer(tile.dataset.src, tile.dataset.label);
+});